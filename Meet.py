@@ -2,11 +2,17 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import yfinance as yf
+import xlsxwriter
 from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from kernels import resolve_trades, scale_prices
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -44,120 +50,385 @@ sl_pct = st.sidebar.number_input(
 )
 
 # Function to standardize date format
-def standardize_date_format(date_str):
-    """Convert various date formats to consistent format"""
-    if pd.isna(date_str) or date_str == '':
+def standardize_dates(dates):
+    """Convert a column of mixed date formats to datetimes, NaT where unparseable"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates
+    
+    # Only columns holding text can be stripped, numeric or empty columns have no .str
+    if pd.api.types.infer_dtype(dates, skipna=True) in ('string', 'mixed', 'mixed-integer'):
+        dates = dates.str.strip().fillna(dates)
+    
+    # Bare numbers (e.g. Excel serials) match none of the supported formats
+    dates = dates.mask(pd.to_numeric(dates, errors='coerce').notna())
+    
+    # ISO dates first (2024-12-03), so day-first parsing cannot swap their day and month
+    parsed = pd.to_datetime(dates, format='ISO8601', errors='coerce')
+    
+    # Everything else is day first (03/12/2024, 18-12-24), falling back to month first (12/25/2024)
+    return parsed.fillna(pd.to_datetime(dates, format='mixed', dayfirst=True, errors='coerce'))
+
+# Function to format symbols for Yahoo Finance
+def format_symbol(symbol):
+    """Add .NS for NSE stocks if not already present"""
+    if not symbol.endswith('.NS'):
+        return f"{symbol}.NS"
+    return symbol
+
+# On-disk cache for downloaded price history
+CACHE_DIR = Path('.cache')
+RECENT_CACHE_TTL = timedelta(days=1)
+
+# Function to download price history for a batch of symbols
+@st.cache_data(ttl=RECENT_CACHE_TTL)
+def download_price_history(symbols, start_date, end_date):
+    """Download daily price history for all symbols in a single batched request"""
+    data = yf.download(
+        [format_symbol(symbol) for symbol in symbols],
+        start=start_date,
+        end=end_date,
+        group_by='ticker',
+        threads=True,
+        progress=False
+    )
+    
+    # Split the combined frame into one history per symbol
+    history = {}
+    tickers = set(data.columns.get_level_values(0))
+    for symbol in symbols:
+        ticker = format_symbol(symbol)
+        if ticker not in tickers:
+            continue
+        symbol_data = data[ticker][['Close', 'High', 'Low']].dropna(how='all')
+        if not symbol_data.empty:
+            history[symbol] = symbol_data
+    
+    return history
+
+# Function to download price history for a single symbol
+def fetch_symbol_history(symbol, start_date, end_date):
+    """Download daily price history for one symbol, or None if Yahoo has no data"""
+    # Ticker objects are cheap: yfinance keeps one shared session and crumb for all of them
+    # and rejects caching sessions such as requests_cache, so repeat requests rely on CACHE_DIR
+    data = yf.Ticker(format_symbol(symbol)).history(start=start_date, end=end_date)
+    if data.empty:
         return None
-        
-    date_str = str(date_str).strip()
-    
-    # List of possible date formats
-    date_formats = [
-        '%d/%m/%Y',    # 03/12/2024
-        '%d-%m-%Y',    # 18-12-2024
-        '%m/%d/%Y',    # 12/03/2024
-        '%Y-%m-%d',    # 2024-12-03
-        '%d/%m/%y',    # 03/12/24
-        '%d-%m-%y',    # 18-12-24
-    ]
-    
-    for fmt in date_formats:
+    
+    # Match the timezone-naive dates returned by yf.download
+    data.index = data.index.tz_localize(None)
+    return data[['Close', 'High', 'Low']]
+
+# Function to read cached price history from disk
+def read_cached_history(symbol):
+    """Return (history, start, end) for a cached symbol, or None if missing or stale"""
+    for path in CACHE_DIR.glob(f"{format_symbol(symbol)}_*.parquet"):
         try:
-            # Parse the date and return datetime object
-            return datetime.strptime(date_str, fmt)
-        except ValueError:
-            continue
+            cached_ticker, start, end = path.stem.rsplit('_', 2)
+            if cached_ticker != format_symbol(symbol):
+                continue
+            start = datetime.strptime(start, '%Y%m%d')
+            end = datetime.strptime(end, '%Y%m%d')
+            
+            # Bars from the last week may still be revised, so expire them after a day
+            written = datetime.fromtimestamp(path.stat().st_mtime)
+            if end > written - timedelta(days=7) and datetime.now() - written > RECENT_CACHE_TTL:
+                path.unlink(missing_ok=True)
+                continue
+            
+            return pd.read_parquet(path), start, end
+        except Exception:
+            # Drop unreadable files and keep looking at the other ranges
+            path.unlink(missing_ok=True)
     
-    # If no format matches, return None
     return None
 
-# Function to get stock price data
-@st.cache_data
-def get_stock_price(symbol, date):
-    """Fetch stock price for a given symbol and date"""
+# Function to write price history to the disk cache
+def write_cached_history(symbol, history, start, end):
+    """Store the history of a symbol covering [start, end) on disk"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    ticker = format_symbol(symbol)
+    target = CACHE_DIR / f"{ticker}_{start:%Y%m%d}_{end:%Y%m%d}.parquet"
+    
+    # Write to a temp file and swap it in, so other sessions never read a partial file
+    fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=f"{ticker}_", suffix='.tmp')
+    os.close(fd)
     try:
-        # Add .NS for NSE stocks if not already present
-        if not symbol.endswith('.NS'):
-            symbol_formatted = f"{symbol}.NS"
+        history.to_parquet(temp_path)
+        Path(temp_path).replace(target)
+    finally:
+        Path(temp_path).unlink(missing_ok=True)
+    
+    # Drop ranges this file covers; a session writing a wider range at the same
+    # time keeps its own file, and may already have removed these
+    for path in CACHE_DIR.glob(f"{ticker}_*.parquet"):
+        parts = path.stem.rsplit('_', 2)
+        if len(parts) != 3 or parts[0] != ticker or path == target:
+            continue
+        if f"{start:%Y%m%d}" <= parts[1] and parts[2] <= f"{end:%Y%m%d}":
+            path.unlink(missing_ok=True)
+
+# Function to load price history, downloading only what is not cached
+def load_price_history(symbols, start_date, end_date, progress_callback=None):
+    """Load daily price history for all symbols from the disk cache or Yahoo Finance"""
+    start_date = pd.Timestamp(start_date).normalize()
+    end_date = pd.Timestamp(end_date).normalize()
+    
+    history = {}
+    cache_start = {}
+    missing = []
+    tails = {}
+    for symbol in symbols:
+        cached = read_cached_history(symbol)
+        if cached is not None:
+            data, cached_start, cached_end = cached
+            if cached_start <= start_date and cached_end >= end_date:
+                history[symbol] = data
+                continue
+            if cached_start <= start_date < cached_end:
+                # Only the tail is missing, extend the cached range
+                history[symbol] = data
+                cache_start[symbol] = cached_start
+                tails[symbol] = pd.Timestamp(cached_end)
+                continue
+        missing.append(symbol)
+    
+    total = len(tails) + (1 if missing else 0)
+    done = 0
+    
+    # Symbols without usable cache share the same range, so download them in one request
+    downloaded = {}
+    if missing:
+        downloaded.update(download_price_history(tuple(missing), start_date, end_date))
+        done += 1
+        if progress_callback is not None:
+            progress_callback(done / total)
+    
+    # Tails start at different dates, so fetch them concurrently one symbol at a time
+    if tails:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {
+                executor.submit(fetch_symbol_history, symbol, tail_start, end_date): symbol
+                for symbol, tail_start in tails.items()
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    data = future.result()
+                except Exception:
+                    # Keep the cached part if the tail cannot be fetched
+                    data = None
+                if data is not None:
+                    downloaded[symbol] = data
+                done += 1
+                if progress_callback is not None:
+                    progress_callback(done / total)
+    
+    for symbol, data in downloaded.items():
+        if symbol in history:
+            combined = pd.concat([history[symbol], data])
+            history[symbol] = combined[~combined.index.duplicated(keep='last')]
         else:
-            symbol_formatted = symbol
-            
-        # Convert date string to datetime if needed
-        if isinstance(date, str):
-            date = standardize_date_format(date)
-            if date is None:
-                return None
-        
-        # Get data for a week around the date to handle weekends/holidays
-        start_date = date - timedelta(days=7)
-        end_date = date + timedelta(days=7)
+            history[symbol] = data
+        write_cached_history(symbol, history[symbol], cache_start.get(symbol, start_date), end_date)
+    
+    return history
+
+# Function to get stock price data
+def get_stock_price(history, date):
+    """Look up the close price for a given date in the downloaded history"""
+    try:
+        if history is None:
+            return None
         
-        # Fetch data
-        ticker = yf.Ticker(symbol_formatted)
-        data = ticker.history(start=start_date, end=end_date)
+        # Use three trading days either side of the date to handle weekends/holidays
+        start_date = date - pd.offsets.BDay(3)
+        end_date = date + pd.offsets.BDay(3)
+        data = history[(history.index >= start_date) & (history.index <= end_date)]
         
         if data.empty:
             return None
             
-        # Find the closest trading day
-        target_date = date.strftime('%Y-%m-%d')
-        if target_date in data.index.strftime('%Y-%m-%d'):
-            return data.loc[data.index.strftime('%Y-%m-%d') == target_date, 'Close'].iloc[0]
+        # Find the closest trading day, preferring the earlier bar on a tie so
+        # the entry price never comes from after the entry without need
+        date = pd.Timestamp(date)
+        after = data.index.searchsorted(date, side='left')
+        before = data.index.searchsorted(date, side='right') - 1
+        if before < 0:
+            pos = after
+        elif after >= len(data) or before == after:
+            pos = before
         else:
-            # Get the closest available date
-            data['date_diff'] = abs((data.index.date - date.date()).days)
-            closest_idx = data['date_diff'].idxmin()
-            return data.loc[closest_idx, 'Close']
+            pos = after if data.index[after] - date < date - data.index[before] else before
+        return float(data['Close'].iat[pos])
             
     except Exception as e:
-        st.error(f"Error fetching data for {symbol}: {str(e)}")
+        st.error(f"Error looking up price for {date}: {str(e)}")
         return None
 
-# Function to determine which hit first
-def check_target_or_sl_first(symbol, entry_date, entry_price, target_price, sl_price):
-    """Check whether target or stop loss was hit first"""
-    try:
-        # Add .NS for NSE stocks
-        if not symbol.endswith('.NS'):
-            symbol_formatted = f"{symbol}.NS"
-        else:
-            symbol_formatted = symbol
-            
-        # Convert date string to datetime if needed
-        if isinstance(entry_date, str):
-            entry_date = standardize_date_format(entry_date)
-            if entry_date is None:
-                return "Invalid Date"
+# Trade results, indexed by the result codes used during analysis
+RESULT_LABELS = np.array(
+    ['Neither Hit', 'Target Hit', 'Stop Loss Hit', 'No Data', 'Price Not Found'],
+    dtype=object
+)
+
+# Function to collect the bars each trade is evaluated on
+def build_trade_windows(history, symbols, entry_dates):
+    """Stack the High/Low bars of the 30 days after each entry into NaN-padded (N, W) arrays"""
+    symbols = np.asarray(symbols, dtype=object)
+    entry_dates = pd.DatetimeIndex(entry_dates).normalize()
+    
+    # Position 0 holds a NaN sentinel used for padding
+    all_highs = [np.array([np.nan])]
+    all_lows = [np.array([np.nan])]
+    offset = 1
+    
+    first_bar = np.zeros(len(symbols), dtype=np.int64)
+    after_entry = np.zeros(len(symbols), dtype=np.int64)
+    last_bar = np.zeros(len(symbols), dtype=np.int64)
+    
+    for symbol in pd.unique(symbols):
+        symbol_history = history.get(symbol)
+        if symbol_history is None:
+            continue
         
-        # Get data for next 30 days
-        start_date = entry_date
-        end_date = entry_date + timedelta(days=30)
+        rows = np.flatnonzero(symbols == symbol)
+        dates = symbol_history.index.values
+        entries = entry_dates[rows]
         
-        ticker = yf.Ticker(symbol_formatted)
-        data = ticker.history(start=start_date, end=end_date)
+        # Window is [entry, entry + 30 days), with the entry date itself skipped
+        first_bar[rows] = offset + np.searchsorted(dates, entries.values, side='left')
+        after_entry[rows] = offset + np.searchsorted(dates, (entries + timedelta(days=1)).values, side='left')
+        last_bar[rows] = offset + np.searchsorted(dates, (entries + timedelta(days=30)).values, side='left')
         
-        if data.empty:
-            return "No Data"
-        
-        # Check each day after entry
-        for idx, row in data.iterrows():
-            if idx.date() > entry_date.date():  # Skip entry date
-                high = row['High']
-                low = row['Low']
-                
-                # Check if target hit (assuming long position)
-                if high >= target_price:
-                    return "Target Hit"
-                
-                # Check if stop loss hit
-                if low <= sl_price:
-                    return "Stop Loss Hit"
+        all_highs.append(symbol_history['High'].to_numpy(dtype=float))
+        all_lows.append(symbol_history['Low'].to_numpy(dtype=float))
+        offset += len(symbol_history)
+    
+    lengths = last_bar - after_entry
+    width = max(int(lengths.max(initial=0)), 1)
+    positions = after_entry[:, None] + np.arange(width)
+    positions = np.where(np.arange(width) < lengths[:, None], positions, 0)
+    
+    highs = np.concatenate(all_highs)[positions]
+    lows = np.concatenate(all_lows)[positions]
+    has_data = last_bar > first_bar
+    
+    return highs, lows, has_data
+
+# Function to classify every trade
+def classify_trades(closes, highs, lows, has_data, target_pct, sl_pct):
+    """Return a code into RESULT_LABELS per trade for the given target and stop loss"""
+    # Calculate target and stop loss prices
+    targets = scale_prices(closes, 1 + target_pct / 100)
+    sls = scale_prices(closes, 1 - sl_pct / 100)
+    
+    # Check which was hit first for all trades at once
+    codes = resolve_trades(highs, lows, targets, sls)
+    
+    # A missing entry price outranks missing post-entry bars
+    codes[~has_data] = 3
+    codes[np.isnan(closes)] = 4
+    
+    return codes
+
+# Columns the uploaded Excel file must contain
+REQUIRED_COLUMNS = ['date', 'symbol', 'marketcapname', 'sector']
+
+# Function to read the uploaded trades
+@st.cache_data(show_spinner=False)
+def load_trades(file_bytes):
+    """Read the uploaded Excel file into (trades, removed_count), or (None, 0) if columns are missing"""
+    # Read only the required columns, loading the text columns as strings so
+    # numeric cells such as a 500325 symbol do not break mixed columns
+    df = pd.read_excel(
+        io.BytesIO(file_bytes),
+        usecols=lambda col: col in REQUIRED_COLUMNS,
+        dtype={'symbol': 'string', 'marketcapname': 'string', 'sector': 'string'}
+    )
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        return None, 0
+    df = df[REQUIRED_COLUMNS]
+    
+    # Store the repeated text columns as categories, with NaN for blank cells
+    for col in ['symbol', 'marketcapname', 'sector']:
+        df[col] = pd.Categorical(df[col].to_numpy(dtype=object, na_value=np.nan))
+    
+    # Auto-fix date formats before processing
+    df['date'] = standardize_dates(df['date'])
+    
+    # Remove rows with invalid dates
+    initial_count = len(df)
+    df = df.dropna(subset=['date'])
+    
+    return df, initial_count - len(df)
+
+# Function to look up prices for the uploaded trades
+@st.cache_data(ttl=RECENT_CACHE_TTL, show_spinner='Fetching stock prices... This may take a while.')
+def fetch_prices(file_bytes):
+    """Return the trades with close prices, plus the closes and the post-entry High/Low windows"""
+    df, _ = load_trades(file_bytes)
+    
+    # Download price history for every symbol in one batch
+    fetch_progress = st.progress(0)
+    # Blank symbols have no price history and end up as 'Price Not Found'
+    symbols = tuple(sorted(df['symbol'].dropna().astype(str).unique()))
+    history = load_price_history(
+        symbols,
+        df['date'].min() - pd.offsets.BDay(3),
+        df['date'].max() + timedelta(days=30),
+        progress_callback=fetch_progress.progress
+    )
+    fetch_progress.empty()
+    
+    # Create progress bar
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    closes = np.full(len(df), np.nan)
+    
+    # Each update is a round-trip to the browser, so refresh about 100 times in total
+    update_every = max(1, len(df) // 100)
+    
+    # Process each row
+    for pos, (symbol, date) in enumerate(zip(df['symbol'].to_numpy(), df['date'])):
+        if pos % update_every == 0:
+            progress = (pos + 1) / len(df)
+            progress_bar.progress(progress)
+            status_text.text(f'Processing {pos + 1}/{len(df)}: {symbol}')
         
-        # If neither hit within 30 days
-        return "Neither Hit"
+        # Get stock price
+        close_price = get_stock_price(history.get(symbol), date)
         
-    except Exception as e:
-        return f"Error: {str(e)}"
+        if close_price is not None:
+            closes[pos] = close_price
+    
+    progress_bar.empty()
+    status_text.empty()
+    
+    df['close_price'] = np.round(np.nan_to_num(closes), 2)
+    highs, lows, has_data = build_trade_windows(history, df['symbol'], df['date'])
+    
+    return df, closes, highs, lows, has_data
+
+# Function to export results to Excel
+def to_excel_bytes(df, sheet_name):
+    """Write a DataFrame to an in-memory xlsx file, streaming it row by row"""
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'default_date_format': 'dd/mm/yyyy',
+        'nan_inf_to_errors': True
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    
+    # constant_memory only keeps the current row, so cells must be written in row order
+    worksheet.write_row(0, 0, df.columns)
+    for row_num, row in enumerate(df.itertuples(index=False), start=1):
+        # Missing values are left blank rather than written as #NUM! errors
+        worksheet.write_row(row_num, 0, [None if pd.isna(value) else value for value in row])
+    
+    workbook.close()
+    return output.getvalue()
 
 # Main app
 def main():
@@ -171,18 +442,15 @@ def main():
     
     if uploaded_file is not None:
         try:
-            # Read the uploaded file
-            df = pd.read_excel(uploaded_file)
+            file_bytes = uploaded_file.getvalue()
+            df, removed_count = load_trades(file_bytes)
             
-            # Auto-fix date formats before processing
-            st.info("🔧 Auto-fixing date formats...")
-            df['date'] = df['date'].apply(lambda x: standardize_date_format(str(x)) if pd.notna(x) else None)
-            
-            # Remove rows with invalid dates
-            initial_count = len(df)
-            df = df.dropna(subset=['date'])
-            removed_count = initial_count - len(df)
+            # Check if required columns exist
+            if df is None:
+                st.error(f"Missing required columns. Required: {REQUIRED_COLUMNS}")
+                st.stop()
             
+            st.info("🔧 Auto-fixing date formats...")
             if removed_count > 0:
                 st.warning(f"⚠️ Removed {removed_count} rows with invalid dates")
             
@@ -192,56 +460,18 @@ def main():
             preview_df['date'] = preview_df['date'].dt.strftime('%d/%m/%Y')
             st.dataframe(preview_df.head(10))
             
-            # Check if required columns exist
-            required_columns = ['date', 'symbol', 'marketcapname', 'sector']
-            if not all(col in df.columns for col in required_columns):
-                st.error(f"Missing required columns. Required: {required_columns}")
-                st.stop()
+            # Prices only depend on the file, so changing target or stop loss reuses them
+            df, closes, highs, lows, has_data = fetch_prices(file_bytes)
             
             # Process data
-            with st.spinner('Fetching stock prices... This may take a while.'):
+            with st.spinner('Analyzing trades...'):
                 
                 # Initialize new columns
-                df['close_price'] = 0.0
                 df['target_pct'] = target_pct
                 df['sl_pct'] = sl_pct
-                df['result'] = 'Processing...'
-                
-                # Create progress bar
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # Process each row
-                for idx, row in df.iterrows():
-                    progress = (idx + 1) / len(df)
-                    progress_bar.progress(progress)
-                    status_text.text(f'Processing {idx + 1}/{len(df)}: {row["symbol"]}')
-                    
-                    # Get stock price
-                    close_price = get_stock_price(row['symbol'], row['date'])
-                    
-                    if close_price is not None:
-                        df.at[idx, 'close_price'] = round(close_price, 2)
-                        
-                        # Calculate target and stop loss prices
-                        target_price = close_price * (1 + target_pct / 100)
-                        sl_price = close_price * (1 - sl_pct / 100)
-                        
-                        # Check which was hit first
-                        result = check_target_or_sl_first(
-                            row['symbol'], 
-                            row['date'], 
-                            close_price, 
-                            target_price, 
-                            sl_price
-                        )
-                        df.at[idx, 'result'] = result
-                    else:
-                        df.at[idx, 'close_price'] = 0.0
-                        df.at[idx, 'result'] = 'Price Not Found'
                 
-                progress_bar.empty()
-                status_text.empty()
+                codes = classify_trades(closes, highs, lows, has_data, target_pct, sl_pct)
+                df['result'] = pd.Categorical.from_codes(codes, categories=RESULT_LABELS)
             
             # Display processed data
             st.subheader("📈 Processed Data with Results")
@@ -259,9 +489,10 @@ def main():
             col1, col2, col3, col4 = st.columns(4)
             
             total_trades = len(df)
-            target_hit = len(df[df['result'] == 'Target Hit'])
-            sl_hit = len(df[df['result'] == 'Stop Loss Hit'])
-            no_result = len(df[df['result'].isin(['Neither Hit', 'No Data', 'Price Not Found'])])
+            result_counts = df['result'].value_counts()
+            target_hit = int(result_counts.get('Target Hit', 0))
+            sl_hit = int(result_counts.get('Stop Loss Hit', 0))
+            no_result = int(result_counts.reindex(['Neither Hit', 'No Data', 'Price Not Found'], fill_value=0).sum())
             
             with col1:
                 st.metric("Total Trades", total_trades)
@@ -275,22 +506,27 @@ def main():
             with col4:
                 st.metric("No Result", no_result, f"{(no_result/total_trades*100):.1f}%")
             
+            # Count results per sector, market cap and month in a single pass
+            # Months are grouped as int32 months since 1970 rather than Period objects
+            df['month'] = df['date'].values.astype('datetime64[M]').astype('int32')
+            result_groups = df.groupby(['sector', 'marketcapname', 'month', 'result'], dropna=False, observed=True).size()
+            
             # Create visualizations
             col1, col2 = st.columns(2)
             
             with col1:
-                # Pie chart of results
-                result_counts = df['result'].value_counts()
+                # Pie chart of results, without the categories no trade ended in
+                observed_counts = result_counts[result_counts > 0]
                 fig_pie = px.pie(
-                    values=result_counts.values, 
-                    names=result_counts.index,
+                    values=observed_counts.values, 
+                    names=observed_counts.index,
                     title="Trade Results Distribution"
                 )
                 st.plotly_chart(fig_pie, use_container_width=True)
             
             with col2:
                 # Sector-wise performance
-                sector_results = df.groupby(['sector', 'result']).size().reset_index(name='count')
+                sector_results = result_groups.groupby(level=['sector', 'result'], observed=True).sum().reset_index(name='count')
                 fig_bar = px.bar(
                     sector_results, 
                     x='sector', 
@@ -303,7 +539,7 @@ def main():
             
             # Market cap analysis
             st.subheader("📈 Market Cap Analysis")
-            marketcap_results = df.groupby(['marketcapname', 'result']).size().reset_index(name='count')
+            marketcap_results = result_groups.groupby(level=['marketcapname', 'result'], observed=True).sum().reset_index(name='count')
             fig_marketcap = px.bar(
                 marketcap_results, 
                 x='marketcapname', 
@@ -315,9 +551,8 @@ def main():
             
             # Time series analysis
             st.subheader("📅 Time Series Analysis")
-            df['date'] = pd.to_datetime(df['date'], format='mixed')
-            df['month'] = df['date'].dt.to_period('M')
-            monthly_results = df.groupby(['month', 'result']).size().reset_index(name='count')
+            monthly_results = result_groups.groupby(level=['month', 'result'], observed=True).sum().reset_index(name='count')
+            monthly_results['month'] = monthly_results['month'].to_numpy().astype('datetime64[M]')
             
             fig_timeline = px.line(
                 monthly_results, 
@@ -331,9 +566,7 @@ def main():
             # P&L Calculation
             st.subheader("💰 Profit & Loss Analysis")
             
-            df['pnl_pct'] = 0.0
-            df.loc[df['result'] == 'Target Hit', 'pnl_pct'] = target_pct
-            df.loc[df['result'] == 'Stop Loss Hit', 'pnl_pct'] = -sl_pct
+            df['pnl_pct'] = df['result'].map({'Target Hit': target_pct, 'Stop Loss Hit': -sl_pct}).fillna(0.0)
             
             total_pnl = df['pnl_pct'].sum()
             win_rate = (target_hit / (target_hit + sl_hit) * 100) if (target_hit + sl_hit) > 0 else 0
@@ -354,13 +587,9 @@ def main():
             st.subheader("💾 Download Processed Data")
             
             # Create Excel file in memory
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                display_df.to_excel(writer, sheet_name='Processed_Data', index=False)
-            
             st.download_button(
                 label="📥 Download Excel File",
-                data=output.getvalue(),
+                data=to_excel_bytes(display_df, 'Processed_Data'),
                 file_name=f"processed_strategy_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
@@ -0,0 +1,33 @@
+"""Numba kernels used by the Trading Strategy Analyzer.
+
+They live outside Meet.py so that Numba's on-disk cache refers to this
+module: loading a cached kernel re-imports its module, which would re-run
+the whole Streamlit page if the kernel were defined in the script.
+"""
+import numpy as np
+from numba import njit, vectorize
+
+# Function to determine which hit first
+@njit(cache=True)
+def resolve_trades(highs, lows, targets, sls):
+    """Return a result code per trade for whether target or stop loss was hit first"""
+    codes = np.zeros(highs.shape[0], dtype=np.int8)
+    for i in range(highs.shape[0]):
+        for j in range(highs.shape[1]):
+            # Check if target hit (assuming long position)
+            if highs[i, j] >= targets[i]:
+                codes[i] = 1
+                break
+            
+            # Check if stop loss hit
+            if lows[i, j] <= sls[i]:
+                codes[i] = 2
+                break
+    
+    return codes
+
+# Function to scale prices by a constant factor
+@vectorize(['float64(float64, float64)'], cache=True)
+def scale_prices(price, factor):
+    """Multiply prices by a factor as a compiled ufunc"""
+    return price * factor
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Meet.py is a Streamlit script rather than a package, so import it from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+import Meet
+
+
+def make_history(dates):
+    index = pd.DatetimeIndex(dates)
+    return pd.DataFrame({'Close': range(len(index)), 'High': 0.0, 'Low': 0.0}, index=index, dtype=float)
+
+
+@pytest.mark.parametrize('date, expected', [
+    # Trading day itself
+    ('2024-01-09', 1.0),
+    # Wednesday with no bar, equidistant Tuesday and Thursday: earlier bar
+    ('2024-01-10', 1.0),
+    # Sunday after a Monday holiday, equidistant Friday and Tuesday: earlier bar
+    ('2024-01-21', 3.0),
+    # Saturday: Friday is closer than Tuesday
+    ('2024-01-20', 3.0),
+])
+def test_closest_bar_prefers_earlier_on_tie(date, expected):
+    history = make_history(['2024-01-08', '2024-01-09', '2024-01-11', '2024-01-19', '2024-01-23'])
+
+    assert Meet.get_stock_price(history, pd.Timestamp(date)) == expected
+
+
+def test_first_bar_used_before_history_starts():
+    history = make_history(['2024-01-09', '2024-01-10'])
+
+    assert Meet.get_stock_price(history, pd.Timestamp('2024-01-08')) == 0.0
+
+
+def test_later_bar_used_when_strictly_closer():
+    history = make_history(['2024-01-05', '2024-01-08'])
+
+    assert Meet.get_stock_price(history, pd.Timestamp('2024-01-07')) == 1.0
+
+
+def test_no_bars_near_the_date():
+    history = make_history(['2024-01-08'])
+
+    assert Meet.get_stock_price(history, pd.Timestamp('2024-03-01')) is None
+    assert Meet.get_stock_price(None, pd.Timestamp('2024-03-01')) is None
@@ -0,0 +1,42 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+import Meet
+
+
+def excel_bytes(df):
+    output = io.BytesIO()
+    df.to_excel(output, index=False)
+    return output.getvalue()
+
+
+def test_mixed_text_and_numeric_symbols_are_read():
+    trades = pd.DataFrame({
+        'date': ['03/12/2024', '04/12/2024', '05/12/2024'],
+        'symbol': ['TCS', 500325, None],
+        'marketcapname': ['Large', None, 'Small'],
+        'sector': ['IT', 'Energy', 'IT'],
+        'notes': ['unused', 'unused', 'unused'],
+    })
+
+    df, removed_count = Meet.load_trades(excel_bytes(trades))
+
+    assert removed_count == 0
+    assert list(df.columns) == Meet.REQUIRED_COLUMNS
+    assert isinstance(df['symbol'].dtype, pd.CategoricalDtype)
+    assert df['symbol'].iloc[0] == 'TCS'
+    assert df['symbol'].iloc[1] == '500325'
+    assert df['symbol'].isna().iloc[2]
+    assert df['marketcapname'].isna().iloc[1]
+
+    # Blank symbols compare as NaN rather than pd.NA, so array lookups keep working
+    symbols = np.asarray(df['symbol'], dtype=object)
+    assert (symbols == 'TCS').tolist() == [True, False, False]
+
+
+def test_missing_required_column_returns_none():
+    trades = pd.DataFrame({'date': ['03/12/2024'], 'symbol': ['TCS']})
+
+    assert Meet.load_trades(excel_bytes(trades)) == (None, 0)
@@ -0,0 +1,72 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import Meet
+
+
+def make_history(start, periods):
+    index = pd.bdate_range(start, periods=periods)
+    return pd.DataFrame({'Close': 100.0, 'High': 101.0, 'Low': 99.0}, index=index)
+
+
+def test_cache_round_trip_replaces_older_range(tmp_path, monkeypatch):
+    monkeypatch.setattr(Meet, 'CACHE_DIR', tmp_path)
+    start, end = pd.Timestamp('2024-01-01'), pd.Timestamp('2024-02-01')
+
+    Meet.write_cached_history('TCS', make_history(start, 5), start, pd.Timestamp('2024-01-15'))
+    Meet.write_cached_history('TCS', make_history(start, 20), start, end)
+
+    history, cached_start, cached_end = Meet.read_cached_history('TCS')
+    assert len(history) == 20
+    assert (cached_start, cached_end) == (start, end)
+    assert [path.name for path in tmp_path.iterdir()] == ['TCS.NS_20240101_20240201.parquet']
+
+
+def test_concurrent_writes_of_the_same_symbol(tmp_path, monkeypatch):
+    monkeypatch.setattr(Meet, 'CACHE_DIR', tmp_path)
+    start = pd.Timestamp('2024-01-01')
+    history = make_history(start, 20)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        ends = [pd.Timestamp('2024-02-01') + pd.Timedelta(days=i % 2) for i in range(32)]
+        for future in [executor.submit(Meet.write_cached_history, 'TCS', history, start, end) for end in ends]:
+            future.result()
+
+    assert Meet.read_cached_history('TCS') is not None
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_stale_wider_file_does_not_hide_fresh_one(tmp_path, monkeypatch):
+    monkeypatch.setattr(Meet, 'CACHE_DIR', tmp_path)
+    downloads = []
+    monkeypatch.setattr(Meet, 'download_price_history', lambda *args: downloads.append(args) or {})
+    today = pd.Timestamp.now().normalize()
+
+    # A wide range reaching into the future, written two days ago and now expired
+    stale_start, stale_end = today - pd.Timedelta(days=60), today + pd.Timedelta(days=30)
+    Meet.write_cached_history('TCS', make_history(stale_start, 60), stale_start, stale_end)
+    stale_path = tmp_path / f"TCS.NS_{stale_start:%Y%m%d}_{stale_end:%Y%m%d}.parquet"
+    aged = (pd.Timestamp.now() - pd.Timedelta(days=2)).timestamp()
+    os.utime(stale_path, (aged, aged))
+
+    # A fresh narrower range that the stale one does not get replaced by
+    fresh_start, fresh_end = today - pd.Timedelta(days=45), today - pd.Timedelta(days=15)
+    Meet.write_cached_history('TCS', make_history(fresh_start, 20), fresh_start, fresh_end)
+
+    for _ in range(3):
+        history = Meet.load_price_history(('TCS',), today - pd.Timedelta(days=40), today - pd.Timedelta(days=20))
+        assert len(history['TCS']) == 20
+
+    assert downloads == []
+    assert not stale_path.exists()
+
+
+def test_unreadable_file_is_removed(tmp_path, monkeypatch):
+    monkeypatch.setattr(Meet, 'CACHE_DIR', tmp_path)
+    broken = tmp_path / 'TCS.NS_20240101_20240201.parquet'
+    broken.write_bytes(b'not parquet')
+
+    assert Meet.read_cached_history('TCS') is None
+    assert not broken.exists()
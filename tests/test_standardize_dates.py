@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Meet
+
+
+def test_supported_formats_are_parsed():
+    dates = pd.Series([' 03/12/2024', '18-12-2024', '2024-12-03', '03/12/24', '12/25/2024', datetime(2024, 12, 3)],
+                      dtype=object)
+
+    assert Meet.standardize_dates(dates).tolist() == [
+        pd.Timestamp('2024-12-03'),
+        pd.Timestamp('2024-12-18'),
+        pd.Timestamp('2024-12-03'),
+        pd.Timestamp('2024-12-03'),
+        pd.Timestamp('2024-12-25'),
+        pd.Timestamp('2024-12-03'),
+    ]
+
+
+@pytest.mark.parametrize('dates', [
+    pd.Series([45000.0, 45001.0]),
+    pd.Series([np.nan, np.nan]),
+    pd.Series([45000, 45001], dtype=object),
+    pd.Series(['junk', 45000], dtype=object),
+])
+def test_numeric_and_empty_columns_are_invalid_dates(dates):
+    assert Meet.standardize_dates(dates).isna().all()
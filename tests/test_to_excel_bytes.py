@@ -0,0 +1,24 @@
+import io
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+import Meet
+
+
+def test_missing_values_are_written_as_blank_cells():
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2024-12-03', '2024-12-04']),
+        'Symbol': ['TCS', 'INFY'],
+        'Market Cap': pd.Categorical(['Large', np.nan]),
+        'Close Price': [3500.5, np.nan],
+    })
+
+    sheet = load_workbook(io.BytesIO(Meet.to_excel_bytes(df, 'Processed_Data')))['Processed_Data']
+    rows = list(sheet.iter_rows(values_only=True))
+
+    assert rows[0] == ('Date', 'Symbol', 'Market Cap', 'Close Price')
+    assert rows[1][1:] == ('TCS', 'Large', 3500.5)
+    assert rows[2][1:] == ('INFY', None, None)
+    assert rows[1][0].date() == pd.Timestamp('2024-12-03').date()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+import Meet
+from kernels import resolve_trades
+
+ENTRY = pd.Timestamp('2024-01-03')
+
+
+def make_history(spikes=None, start='2024-01-01', end='2024-02-29'):
+    """Flat bars around 100, with High/Low overridden on the given dates"""
+    index = pd.bdate_range(start, end)
+    history = pd.DataFrame({'Close': 100.0, 'High': 101.0, 'Low': 99.0}, index=index)
+    for date, (high, low) in (spikes or {}).items():
+        history.loc[pd.Timestamp(date), ['High', 'Low']] = [high, low]
+    return history
+
+
+def classify(history, entry_dates=(ENTRY,), closes=None, has_history=True):
+    """Run the full window + kernel pipeline with a 3% target and 2% stop loss"""
+    symbols = ['TCS'] * len(entry_dates)
+    highs, lows, has_data = Meet.build_trade_windows({'TCS': history} if has_history else {}, symbols, entry_dates)
+    closes = np.full(len(entry_dates), 100.0) if closes is None else np.asarray(closes, dtype=float)
+    return Meet.classify_trades(closes, highs, lows, has_data, 3.0, 2.0).tolist()
+
+
+def test_entry_day_is_skipped():
+    history = make_history({ENTRY: (200.0, 1.0)})
+
+    assert classify(history) == [0]
+
+
+def test_window_ends_before_entry_plus_30_days():
+    last_day = ENTRY + pd.Timedelta(days=29)
+    after_window = ENTRY + pd.Timedelta(days=30)
+
+    assert classify(make_history({last_day: (200.0, 99.0)})) == [1]
+    assert classify(make_history({after_window: (200.0, 99.0)})) == [0]
+
+
+def test_target_wins_over_stop_loss_on_the_same_bar():
+    history = make_history({'2024-01-05': (200.0, 1.0)})
+
+    assert classify(history) == [1]
+
+
+def test_first_hit_decides():
+    history = make_history({'2024-01-05': (101.0, 1.0), '2024-01-08': (200.0, 99.0)})
+
+    assert classify(history) == [2]
+
+
+def test_nan_padding_never_counts_as_hit():
+    # The later entry has a shorter window, so its row is padded with NaN
+    history = make_history(end='2024-01-12')
+    highs, lows, has_data = Meet.build_trade_windows({'TCS': history}, ['TCS', 'TCS'],
+                                                     [ENTRY, pd.Timestamp('2024-01-10')])
+
+    assert np.isnan(highs[1, -1]) and np.isnan(lows[1, -1])
+    assert resolve_trades(highs, lows, np.array([-np.inf, -np.inf]), np.array([np.inf, np.inf]))[1] == 1
+    assert resolve_trades(highs, lows, np.array([np.inf, np.inf]), np.array([-np.inf, -np.inf])).tolist() == [0, 0]
+    assert resolve_trades(np.full((1, 3), np.nan), np.full((1, 3), np.nan), np.array([0.0]), np.array([1e9]))[0] == 0
+
+
+def test_no_data_and_price_not_found_precedence():
+    # Entry after the last bar: a price exists but no bars follow, versus no price at all
+    late_entry = [pd.Timestamp('2024-03-15')] * 2
+
+    assert classify(make_history(), late_entry, closes=[100.0, np.nan]) == [3, 4]
+    assert classify(make_history(), (ENTRY,), closes=[np.nan], has_history=False) == [4]
+    assert classify(make_history(), (ENTRY,), closes=[100.0], has_history=False) == [3]